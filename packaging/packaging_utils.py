@@ -108,24 +108,15 @@ def reorient_to_rpi(path_dataset):
     return orig_orientation_dict
 
 
-def reorient_to_original_orientation(path_out, orig_orientation_dict):
+def reorient_to_original_orientation(fname_file, orig_orientation):
     """
-    Reorient all images in a dataset to the original orientation
-    :param path_out: path to the dataset
-    :param orig_orientation_dict: dict of original orientations of the images
+    Reorient an image (in-place) back to its original orientation
+    :param fname_file: path to the image
+    :param orig_orientation: original orientation of the image, e.g. LPI (see reorient_to_rpi())
     :return:
     """
-    # iterate through all files, do in-place reorientation to the original orientation
-    for file in os.listdir(path_out):
-        if file.endswith('.nii.gz'):
-            # get absolute path to the image
-            fname_file = os.path.join(path_out, file)
-
-            # fetch the original orientation of the image
-            orig_orientation = orig_orientation_dict[add_suffix(file, '_0000')]
-
-            # skip if already in RPI
-            if orig_orientation != 'RPI':
-                # reorient the image to the original orientation using SCT
-                os.system('sct_image -i {} -setorient {} -o {}'.format(fname_file, orig_orientation, fname_file))
-                print(f'Reorientation to original orientation {orig_orientation} done.')
+    # skip if already in RPI
+    if orig_orientation != 'RPI':
+        # reorient the image to the original orientation using SCT
+        os.system('sct_image -i {} -setorient {} -o {}'.format(fname_file, orig_orientation, fname_file))
+        print(f'Reorientation of {os.path.basename(fname_file)} to original orientation {orig_orientation} done.')
@@ -1,14 +1,23 @@
 import os
+import shutil
 import argparse
 import torch
-import glob
 import time
 import numpy as np
-import nibabel as nib
+from functools import partial
 from packaging_utils import convert_filenames_to_nnunet_format, reorient_to_rpi, reorient_to_original_orientation
 
-from nnunetv2.inference.predict_from_raw_data import predict_from_raw_data as predictor
-# from nnunetv2.inference.predict_from_raw_data import nnUNetPredictor
+import SimpleITK as sitk
+from acvl_utils.cropping_and_padding.padding import pad_nd_image
+from batchgenerators.utilities.file_and_folder_operations import load_json
+from tqdm import tqdm
+from nnunetv2.configuration import default_num_processes
+from nnunetv2.imageio.simpleitk_reader_writer import SimpleITKIO
+from nnunetv2.inference import predict_from_raw_data
+from nnunetv2.inference.predict_from_raw_data import nnUNetPredictor
+from nnunetv2.inference.export_prediction import convert_predicted_logits_to_segmentation_with_correct_shape
+from nnunetv2.inference.sliding_window_prediction import compute_gaussian
+from nnunetv2.utilities.helpers import empty_cache, dummy_context
 
 
 """
@@ -22,6 +31,17 @@ Method 1 (when running on whole dataset):
         --tile-step-size 0.5           
 """
 
+# subfolder (of --path-out) and filename suffix of the saved predictions for each --pred-type
+PRED_TYPE_OUTPUTS = {
+    'all': ('', '_pred'),
+    'sc-seg': ('sc-seg', '_pred-sc'),
+    'lesion-seg': ('lesion-seg', '_pred-lesion'),
+}
+
+# buffer in which export_split_prediction_from_logits() writes the split segmentations. Each export worker (process)
+# exports several images one after the other, hence the buffer is reused instead of allocating a new array per image
+split_buffer = np.empty(0, dtype=np.uint8)
+
 
 def get_parser():
     # parse command line arguments
@@ -41,18 +61,271 @@ def get_parser():
     parser.add_argument('--use-best-checkpoint', action='store_true', default=False,
                         help='Use the best checkpoint (instead of the final checkpoint) for prediction. '
                         'NOTE: nnUNet by default uses the final checkpoint. Default: False')
-    parser.add_argument('--tile-step-size', default=0.5, type=float,
-                        help='Tile step size defining the overlap between images patches during inference. Default: 0.5 '
+    parser.add_argument('--tile-step-size', default=0.7, type=float,
+                        help='Tile step size defining the overlap between images patches during inference. Default: 0.7 '
                                 'NOTE: changing it from 0.5 to 0.9 makes inference faster but there is a small drop in '
-                                'performance.')
+                                'performance. Use 0.5 to reproduce the results reported for the model.')
+    parser.add_argument('--sw-batch-size', default=1, type=int,
+                        help='Number of sliding window patches fed to the network at once. Larger values make '
+                                'inference faster (especially on GPU), but increase the memory usage roughly '
+                                'linearly. Default: 1')
+    parser.add_argument('--amp', action=argparse.BooleanOptionalAction, default=True,
+                        help='Run the network in mixed precision (FP16 autocast) when using the GPU. This halves the '
+                             'memory traffic and uses the tensor cores on recent GPUs. Ignored on CPU. Use --no-amp '
+                             'to run in FP32. Default: True')
+    parser.add_argument('--compile', action='store_true', default=False,
+                        help='Compile the network with torch.compile() before inference. The first patches are slower '
+                             'because of the compilation, but the remaining ones are faster. Useful for large '
+                             'datasets. Default: False')
 
     return parser
 
 
+class nnUNetPredictorSCI(nnUNetPredictor):
+    """
+    nnUNetPredictor that runs the sliding window inference on batches of `sw_batch_size` patches instead of one
+    patch at a time, so that the GPU is better used. FP16 autocast on GPU can be turned off with `use_amp=False`.
+    The predictions are directly exported as the spinal cord or the lesion segmentation, given `pred_type`, and
+    reoriented back to their original orientation if `orig_orientation_dict` is given (see
+    export_split_prediction_from_logits())
+    """
+    def __init__(self, *args, sw_batch_size=1, use_amp=True, pred_type='all', orig_orientation_dict=None,
+                 num_threads_export=default_num_processes, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sw_batch_size = sw_batch_size
+        self.use_amp = use_amp
+        self.pred_type = pred_type
+        self.orig_orientation_dict = orig_orientation_dict
+        self.num_threads_export = num_threads_export
+
+    def predict_from_data_iterator(self, data_iterator, save_probabilities=False,
+                                   num_processes_segmentation_export=default_num_processes):
+        """
+        Same as nnUNetPredictor.predict_from_data_iterator(), except that the predictions are exported with
+        export_split_prediction_from_logits()
+        """
+        # nnUNet looks the export function up in its module when sending the predictions to the background workers,
+        # hence swap it with ours for the duration of the prediction
+        export_prediction_from_logits = predict_from_raw_data.export_prediction_from_logits
+        predict_from_raw_data.export_prediction_from_logits = partial(export_split_prediction_from_logits,
+                                                                      pred_type=self.pred_type,
+                                                                      orig_orientation_dict=self.orig_orientation_dict,
+                                                                      num_threads_torch=self.num_threads_export)
+        try:
+            return super().predict_from_data_iterator(data_iterator, save_probabilities,
+                                                      num_processes_segmentation_export)
+        finally:
+            predict_from_raw_data.export_prediction_from_logits = export_prediction_from_logits
+
+    def predict_sliding_window_return_logits(self, input_image):
+        """
+        Same as nnUNetPredictor.predict_sliding_window_return_logits(), except that the patches are stacked along the
+        batch dimension before being passed to the network. Adapted from:
+        https://github.com/MIC-DKFZ/nnUNet/blob/v2.2.1/nnunetv2/inference/predict_from_raw_data.py
+        :param input_image: preprocessed image of shape (c, x, y, z)
+        :return: predicted_logits: logits of shape (num_segmentation_heads, x, y, z)
+        """
+        assert isinstance(input_image, torch.Tensor)
+        self.network = self.network.to(self.device)
+        self.network.eval()
+
+        empty_cache(self.device)
+
+        # NOTE: like nnUNet, autocast is only enabled on cuda devices (it is very slow on some CPUs)
+        use_autocast = self.device.type == 'cuda' and self.use_amp
+        with torch.no_grad():
+            with torch.autocast('cuda', dtype=torch.float16) if use_autocast else dummy_context():
+                assert input_image.ndim == 4, 'input_image must be a 4D np.ndarray or torch.Tensor (c, x, y, z)'
+
+                # if input_image is smaller than tile_size we need to pad it to tile_size.
+                data, slicer_revert_padding = pad_nd_image(input_image, self.configuration_manager.patch_size,
+                                                           'constant', {'value': 0}, True, None)
+
+                slicers = self._internal_get_sliding_window_slicers(data.shape[1:])
+
+                # preallocate results and num_predictions
+                results_device = self.device if self.perform_everything_on_gpu else torch.device('cpu')
+                try:
+                    # NOTE: nnUNet's data iterator yields pageable tensors, so this copy is effectively synchronous.
+                    # Pinning the image here is not worth it: it would happen once per fold, and the GPU work right
+                    # after depends on the copy anyway, so there is nothing to overlap it with
+                    data = data.to(self.device, non_blocking=True)
+                    predicted_logits = torch.zeros((self.label_manager.num_segmentation_heads, *data.shape[1:]),
+                                                   dtype=torch.half, device=results_device)
+                    n_predictions = torch.zeros(data.shape[1:], dtype=torch.half, device=results_device)
+                    if self.use_gaussian:
+                        gaussian = compute_gaussian(tuple(self.configuration_manager.patch_size), sigma_scale=1. / 8,
+                                                    value_scaling_factor=10, device=results_device)
+                except RuntimeError:
+                    # sometimes the stuff is too large for GPUs. In that case fall back to CPU
+                    results_device = torch.device('cpu')
+                    data = data.to(results_device)
+                    predicted_logits = torch.zeros((self.label_manager.num_segmentation_heads, *data.shape[1:]),
+                                                   dtype=torch.half, device=results_device)
+                    n_predictions = torch.zeros(data.shape[1:], dtype=torch.half, device=results_device)
+                    if self.use_gaussian:
+                        gaussian = compute_gaussian(tuple(self.configuration_manager.patch_size), sigma_scale=1. / 8,
+                                                    value_scaling_factor=10, device=results_device)
+                finally:
+                    empty_cache(self.device)
+
+                # if the data did not fit on the GPU, the patches are copied to the GPU batch by batch. Stage them in a
+                # pinned buffer so that these copies are asynchronous. The buffer can be safely reused for the next
+                # batch because copying the prediction back to the CPU waits for the GPU to be done
+                workon_pinned = None
+                if data.device.type == 'cpu' and self.device.type == 'cuda':
+                    workon_pinned = torch.empty((self.sw_batch_size, *data[slicers[0]].shape), dtype=data.dtype,
+                                                pin_memory=True)
+
+                for i in tqdm(range(0, len(slicers), self.sw_batch_size), disable=not self.allow_tqdm):
+                    batch_slicers = slicers[i:i + self.sw_batch_size]
+                    # stack the patches along the batch dimension, i.e. (b, c, x, y, z)
+                    patches = [data[sl] for sl in batch_slicers]
+                    if workon_pinned is not None:
+                        workon = torch.stack(patches, out=workon_pinned[:len(patches)])
+                    else:
+                        workon = torch.stack(patches)
+                    workon = workon.to(self.device, non_blocking=True)
+
+                    prediction = self._internal_maybe_mirror_and_predict(workon).to(results_device)
+
+                    for sl, pred in zip(batch_slicers, prediction):
+                        # NOTE: the prediction is not used afterwards, so it can be weighted in-place
+                        predicted_logits[sl] += (pred.mul_(gaussian) if self.use_gaussian else pred)
+                        n_predictions[sl[1:]] += (gaussian if self.use_gaussian else 1)
+
+                predicted_logits /= n_predictions
+        empty_cache(self.device)
+        return predicted_logits[tuple([slice(None), *slicer_revert_padding[1:]])]
+
+
+def split_labels(seg, pred_type, out=None):
+    """
+    Split a segmentation into the spinal cord or the lesion segmentation
+    :param seg: segmentation, where 1 is the SC (without the lesion) and 2 is the lesion
+    :param pred_type: type of prediction to obtain: 'all', 'sc-seg' or 'lesion-seg'
+    :param out: 1D uint8 buffer with at least seg.size elements in which the split segmentation is written. If None,
+    a new array is allocated
+    :return: seg: the split segmentation (unchanged if pred_type is 'all')
+    """
+    if pred_type == 'all':
+        return seg
+
+    if out is None:
+        out = np.empty(seg.shape, dtype=np.uint8)
+    else:
+        out = out[:seg.size].reshape(seg.shape)
+
+    # NOTE: the comparisons write 0/1 directly into the uint8 output, i.e. there is no intermediate boolean mask
+    if pred_type == 'sc-seg':
+        # NOTE: label 1 is only the SC without the lesion, but the lesion (label 2) also has to be included in the SC
+        np.greater_equal(seg, 1, out=out)
+    elif pred_type == 'lesion-seg':
+        np.equal(seg, 2, out=out)
+    return out
+
+
+def write_seg(rw, seg, output_fname, properties):
+    """
+    Save a segmentation with the nnUNet image reader/writer `rw`. For SimpleITK, the file is compressed with the
+    fastest gzip level (1) instead of the default one, which is much faster while the masks remain small (they have
+    a low entropy).
+    Adapted from: https://github.com/MIC-DKFZ/nnUNet/blob/v2.2.1/nnunetv2/imageio/simpleitk_reader_writer.py
+    :param rw: nnUNet image reader/writer, e.g. SimpleITKIO
+    :param seg: segmentation of shape (x, y, z), or (1, x, y) for 2D
+    :param output_fname: path to the output file
+    :param properties: properties of the image returned by the reader/writer
+    :return:
+    """
+    if not isinstance(rw, SimpleITKIO):
+        rw.write_seg(seg, output_fname, properties)
+        return
+
+    assert seg.ndim == 3, 'segmentation must be 3d. If you are exporting a 2d segmentation, please provide it as ' \
+                          'shape 1,x,y'
+    output_dimension = len(properties['sitk_stuff']['spacing'])
+    assert 1 < output_dimension < 4
+    if output_dimension == 2:
+        seg = seg[0]
+
+    itk_image = sitk.GetImageFromArray(seg.astype(np.uint8, copy=False))
+    itk_image.SetSpacing(properties['sitk_stuff']['spacing'])
+    itk_image.SetOrigin(properties['sitk_stuff']['origin'])
+    itk_image.SetDirection(properties['sitk_stuff']['direction'])
+
+    sitk.WriteImage(itk_image, output_fname, useCompression=True, compressionLevel=1)
+
+
+def export_split_prediction_from_logits(predicted_logits, properties_dict, configuration_manager, plans_manager,
+                                        dataset_json_dict_or_file, output_file_truncated, save_probabilities=False,
+                                        pred_type='all', orig_orientation_dict=None,
+                                        num_threads_torch=default_num_processes):
+    """
+    Same as nnUNet's export_prediction_from_logits(), except that the segmentation is split according to `pred_type`
+    right after being computed from the logits and saved as <case><suffix>.nii.gz in the corresponding subfolder (see
+    PRED_TYPE_OUTPUTS). This avoids saving the combined prediction and loading it back only to split it.
+    If `orig_orientation_dict` is given (see reorient_to_rpi()), the saved prediction is also reoriented back to the
+    original orientation of the image. Since this runs in nnUNet's background workers, the reorientation overlaps
+    with the prediction of the next images.
+    `num_threads_torch` is the number of torch threads used to resample the logits (like in nnUNet).
+    NOTE: save_probabilities is not supported, it is only here to match the signature of the nnUNet function.
+    Adapted from: https://github.com/MIC-DKFZ/nnUNet/blob/v2.2.1/nnunetv2/inference/export_prediction.py
+    """
+    if isinstance(dataset_json_dict_or_file, str):
+        dataset_json_dict_or_file = load_json(dataset_json_dict_or_file)
+
+    label_manager = plans_manager.get_label_manager(dataset_json_dict_or_file)
+    segmentation = convert_predicted_logits_to_segmentation_with_correct_shape(
+        predicted_logits, plans_manager, configuration_manager, label_manager, properties_dict,
+        return_probabilities=False, num_threads_torch=num_threads_torch
+    )
+    del predicted_logits
+
+    # save the split segmentation
+    subfolder, suffix = PRED_TYPE_OUTPUTS[pred_type]
+    path_out = os.path.join(os.path.dirname(output_file_truncated), subfolder,
+                            os.path.basename(output_file_truncated) + suffix + dataset_json_dict_or_file['file_ending'])
+    # NOTE: the buffer can be reused for the next image once the segmentation has been written
+    global split_buffer
+    if split_buffer.size < segmentation.size:
+        split_buffer = np.empty(segmentation.size, dtype=np.uint8)
+    rw = plans_manager.image_reader_writer_class()
+    write_seg(rw, split_labels(segmentation, pred_type, out=split_buffer), path_out, properties_dict)
+
+    if orig_orientation_dict is not None:
+        # NOTE: the keys are the filenames of the input images, e.g. sub-001_T2w_0000.nii.gz
+        fname_image = os.path.basename(output_file_truncated) + '_0000' + dataset_json_dict_or_file['file_ending']
+        reorient_to_original_orientation(path_out, orig_orientation_dict[fname_image])
+
+
 def main():
 
     parser = get_parser()
     args = parser.parse_args()
+    if args.sw_batch_size < 1:
+        parser.error('--sw-batch-size must be >= 1')
+
+    if args.use_gpu:
+        # the network is always run on the same patch size, so let cuDNN pick the fastest convolution algorithms
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+
+    # number of background workers used by nnUNet to preprocess the images and to export the predictions
+    num_processes_preprocessing, num_processes_segmentation_export = 3, 3
+    # number of torch threads used by each export worker (nnUNet's default)
+    num_threads_export = default_num_processes
+    if not args.use_gpu:
+        # on CPU, the workers compete with the prediction for the cores, and by default each of them uses all the cores
+        # (OpenMP/MKL). Hence, limit the workers (which inherit the environment) to a share of the cores. The
+        # prediction (the only heavy part, the workers are mostly idle) still uses all the cores, like in nnUNet
+        num_processes = num_processes_preprocessing + num_processes_segmentation_export
+        num_threads_per_process = max(1, os.cpu_count() // (num_processes + 1))
+        os.environ.setdefault('OMP_NUM_THREADS', str(num_threads_per_process))
+        os.environ.setdefault('MKL_NUM_THREADS', str(num_threads_per_process))
+        torch.set_num_threads(os.cpu_count())
+        # NOTE: nnUNet explicitly sets the number of torch threads of the export workers when resampling the logits,
+        # which would override OMP_NUM_THREADS
+        num_threads_export = num_threads_per_process
 
     # Create output directory if it does not exist
     if not os.path.exists(args.path_out):
@@ -70,141 +343,92 @@ def main():
     # Reorient the images to RPI orientation (because the model was trained on RPI orientated images)
     orig_orientation_dict = reorient_to_rpi(path_data_tmp)
 
-    # Use all the folds available in the model folder by default
-    folds_avail = [int(f.split('_')[-1]) for f in os.listdir(args.path_model) if f.startswith('fold_')]
+    # Create the folder for the predictions, e.g. path_out/sc-seg
+    out_folder = os.path.join(args.path_out, PRED_TYPE_OUTPUTS[args.pred_type][0])
+    if not os.path.exists(out_folder):
+        os.makedirs(out_folder, exist_ok=True)
 
-    # ---------------------------------------------------------------
-    # OPTION 1: Currently, pip install nnUNetv2 does not have the latest version of nnUNet's inference 
-    # which is defined in OPTION 2. Hence, this method
-    # ---------------------------------------------------------------
+    # Use all the folds available in the model folder by default
+    # NOTE: os.scandir() (like os.listdir()) returns the entries in arbitrary order, hence sort the folds so that they
+    # are always ensembled in the same order
+    with os.scandir(args.path_model) as it:
+        folds_avail = sorted(int(entry.name[len('fold_'):]) for entry in it
+                             if entry.is_dir() and entry.name.startswith('fold_'))
 
     print('Starting inference...')
-    start = time.time()
-    # directly call the predict function
-    predictor(
-        list_of_lists_or_source_folder=path_data_tmp,
-        output_folder=args.path_out,
-        model_training_output_dir=args.path_model,
-        use_folds=folds_avail,
-        tile_step_size=args.tile_step_size,                     # changing it from 0.5 to 0.9 makes inference faster
-        use_gaussian=True,                                      # applies gaussian noise and gaussian blur
-        use_mirroring=False,                                    # test time augmentation by mirroring on all axes
+    # NOTE: time.perf_counter() is monotonic, unlike time.time() which can jump (e.g. NTP updates)
+    start = time.perf_counter()
+
+    # instantiate the nnUNetPredictor
+    predictor = nnUNetPredictorSCI(
+        tile_step_size=args.tile_step_size,     # changing it from 0.5 to 0.9 makes inference faster
+        use_gaussian=True,                      # weights the predictions of the patches with a gaussian
+        use_mirroring=False,                    # test time augmentation by mirroring on all axes
         perform_everything_on_gpu=True if args.use_gpu else False,
         device=torch.device('cuda', 0) if args.use_gpu else torch.device('cpu'),
         verbose=False,
-        save_probabilities=False,
-        overwrite=True,
-        checkpoint_name='checkpoint_final.pth' if not args.use_best_checkpoint else 'checkpoint_best.pth',
-        num_processes_preprocessing=3,
-        num_processes_segmentation_export=3
+        verbose_preprocessing=False,
+        allow_tqdm=True,
+        sw_batch_size=args.sw_batch_size,
+        use_amp=args.amp,
+        pred_type=args.pred_type,
+        orig_orientation_dict=orig_orientation_dict,    # reorient the predictions back while they are exported
+        num_threads_export=num_threads_export
     )
-    end = time.time()
-    
-    # ---------------------------------------------------------------
-    # OPTION 2
-    # ---------------------------------------------------------------
+    print('Running inference on device: {}'.format(predictor.device))
 
-    # instantiate the nnUNetPredictor
-    # predictor = nnUNetPredictor(
-    #     tile_step_size=0.5,
-    #     use_gaussian=True,
-    #     use_mirroring=True,
-    #     perform_everything_on_gpu=True if args.use_gpu else False,
-    #     device=torch.device('cuda', 0) if args.use_gpu else torch.device('cpu'),
-    #     verbose=False,
-    #     verbose_preprocessing=False,
-    #     allow_tqdm=True
-    # )
-    # print('Running inference on device: {}'.format(predictor.device))
-
-    # # initializes the network architecture, loads the checkpoint
-    # predictor.initialize_from_trained_model_folder(
-    #     join(args.path_model),
-    #     use_folds=(0, 1),   # 
-    #     checkpoint_name='checkpoint_final.pth',
-    # )
-    # print('Model loaded successfully. Fetching test data...')
-
-    # # variant 1: give input and output folders
-    # # adapted from: https://github.com/MIC-DKFZ/nnUNet/tree/master/nnunetv2/inference
-    # if args.path_data is not None:
-    #     predictor.predict_from_files(path_data_tmp, path_out,
-    #                                 save_probabilities=False, overwrite=False,
-    #                                 num_processes_preprocessing=2, num_processes_segmentation_export=2,
-    #                                 folder_with_segs_from_prev_stage=None, num_parts=1, part_id=0)
-
-    # # variant 2, use list of files as inputs. Note the usage of nested lists
-    # if args.path_image is not None:
-    #     # get absolute path to the image
-    #     args.path_image = Path(args.path_image).absolute()
-
-    #     predictor.predict_from_list_of_files([[args.path_image]], args.path_out,
-    #                                          save_probabilities=False, overwrite=False,
-    #                                          num_processes_preprocessing=2, num_processes_segmentation_export=2,
-    #                                          folder_with_segs_from_prev_stage=None, num_parts=1, part_id=0)
+    if args.compile:
+        # nnUNet compiles the network with torch.compile() after loading the checkpoint if this variable is set
+        os.environ['nnUNet_compile'] = 'True'
+
+    # initializes the network architecture, loads the checkpoint
+    predictor.initialize_from_trained_model_folder(
+        args.path_model,
+        use_folds=folds_avail,
+        checkpoint_name='checkpoint_final.pth' if not args.use_best_checkpoint else 'checkpoint_best.pth',
+    )
+    # NOTE: test time augmentation (mirroring) is already disabled with use_mirroring=False; also drop the mirroring
+    # axes stored in the checkpoint so that no mirrored prediction can be run whatever use_mirroring is
+    predictor.allowed_mirroring_axes = None
+    print('Model loaded successfully. Fetching test data...')
+
+    # move the network to the device once, before entering inference mode
+    predictor.network = predictor.network.to(predictor.device)
+
+    if args.use_gpu:
+        # time the prediction as well, i.e. without the model loading. NOTE: this also includes the preprocessing and
+        # the export of the predictions, which run in parallel with the GPU
+        start_event, end_event = torch.cuda.Event(enable_timing=True), torch.cuda.Event(enable_timing=True)
+        start_event.record()
+
+    # give input and output folders
+    # adapted from: https://github.com/MIC-DKFZ/nnUNet/tree/master/nnunetv2/inference
+    # NOTE: nnUNet only uses torch.no_grad(); inference_mode() also skips the autograd bookkeeping (version counters)
+    with torch.inference_mode():
+        predictor.predict_from_files(
+            list_of_lists_or_source_folder=path_data_tmp,
+            output_folder_or_list_of_truncated_output_files=args.path_out,
+            save_probabilities=False,
+            overwrite=True,
+            num_processes_preprocessing=num_processes_preprocessing,
+            num_processes_segmentation_export=num_processes_segmentation_export,
+            folder_with_segs_from_prev_stage=None,
+            num_parts=1,
+            part_id=0
+        )
+
+    if args.use_gpu:
+        end_event.record()
+        torch.cuda.synchronize()
+        # NOTE: elapsed_time() is in milliseconds
+        gpu_time = start_event.elapsed_time(end_event) / 1000
+    end = time.perf_counter()
 
     print('Inference done.')
 
     print('Deleting the temporary folder...')
     # delete the temporary folder
-    os.system('rm -rf {}'.format(path_data_tmp))
-
-    print('Re-orienting the predictions back to original orientation...')    
-    # reorient the images back to original orientation
-    reorient_to_original_orientation(args.path_out, orig_orientation_dict)
-
-    # split the predictions into different sc-seg and lesion-seg
-    if args.pred_type == 'all':
-        out_folder = os.path.join(args.path_out)
-        # rename the files to add _pred suffix
-        pred_files = sorted(glob.glob(os.path.join(args.path_out, '*.nii.gz')))
-        for pred in pred_files:
-            os.rename(pred, pred.replace('.nii.gz', '_pred.nii.gz'))
-    elif args.pred_type == 'sc-seg':
-        out_folder = os.path.join(args.path_out, 'sc-seg')
-        if not os.path.exists(out_folder):
-            os.makedirs(out_folder, exist_ok=True)
-
-        # get all the predictions
-        pred_files = sorted(glob.glob(os.path.join(args.path_out, '*.nii.gz')))
-        for pred in pred_files:
-            # load the image
-            img_nii = nib.load(pred)
-            img = img_nii.get_fdata()
-
-            # split the labels
-            img_sc_seg = np.zeros_like(img)
-            img_sc_seg[img == 1] = 1    # NOTE: this is only the SC without the lesion
-            img_sc_seg[img == 2] = 1    # since lesion also has be to be included in the SC
-
-            # save the images
-            save_name = os.path.basename(pred).replace('.nii.gz', '_pred-sc.nii.gz')
-            path_out = os.path.join(out_folder, save_name)
-            nib.save(nib.Nifti1Image(img_sc_seg, img_nii.affine, img_nii.header), path_out)
-
-    elif args.pred_type == 'lesion-seg':
-        out_folder = os.path.join(args.path_out, 'lesion-seg')
-        if not os.path.exists(out_folder):
-            os.makedirs(out_folder, exist_ok=True)
-
-        # get all the predictions
-        pred_files = sorted(glob.glob(os.path.join(args.path_out, '*.nii.gz')))
-        for pred in pred_files:
-            # load the image
-            img_nii = nib.load(pred)
-            img = img_nii.get_fdata()
-
-            # split the labels
-            img_lesion_seg = np.zeros_like(img)
-            img_lesion_seg[img == 2] = 1
-
-            # save the images
-            save_name = os.path.basename(pred).replace('.nii.gz', '_pred-lesion.nii.gz')
-            path_out = os.path.join(out_folder, save_name)
-            nib.save(nib.Nifti1Image(img_lesion_seg, img_nii.affine, img_nii.header), path_out)
-
-    else:
-        raise ValueError('Invalid value for --pred_type. Valid values are: [all, sc-seg, lesion-seg]')
+    shutil.rmtree(path_data_tmp, ignore_errors=True)
 
     print('----------------------------------------------------')
     print('Results can be found in: {}'.format(out_folder))
@@ -212,6 +436,9 @@ def main():
 
     total_time = end - start
     print('Total time elapsed: {} minute(s) {} seconds'.format(int(total_time // 60), int(round(total_time % 60))))
+    if args.use_gpu:
+        print('Prediction time (excluding model loading): {} minute(s) {} seconds'.format(int(gpu_time // 60),
+                                                                                        int(round(gpu_time % 60))))
     print('----------------------------------------------------')
 
 
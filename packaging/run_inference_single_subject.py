@@ -150,7 +150,11 @@ def main():
     fname_file_tmp_list = [[fname_file_tmp]]
 
     # Use all the folds available in the model folder by default
-    folds_avail = [int(f.split('_')[-1]) for f in os.listdir(args.path_model) if f.startswith('fold_')]
+    # NOTE: os.scandir() (like os.listdir()) returns the entries in arbitrary order, hence sort the folds so that they
+    # are always ensembled in the same order
+    with os.scandir(args.path_model) as it:
+        folds_avail = sorted(int(entry.name[len('fold_'):]) for entry in it
+                             if entry.is_dir() and entry.name.startswith('fold_'))
 
     # Create directory for nnUNet prediction
     tmpdir_nnunet = os.path.join(tmpdir, 'nnUNet_prediction')
@@ -150,18 +150,19 @@ def get_test_metrics_by_dataset(pred_folder, gt_folder, output_folder, anima_bin
                 sub_ses_pred, sub_ses_gt = f"{sub_pred}_{ses_pred}", f"{sub_gt}_{ses_gt}"
             assert sub_ses_pred == sub_ses_gt, 'Subject and session IDs for Preds and GTs do not match. Please check the filenames.'
 
-            for seg in ['sc', 'lesion']:
-                # load the predictions and GTs
-                pred_npy = nib.load(pred_file).get_fdata()
-                gt_npy = nib.load(gt_file).get_fdata()
+            # load the predictions and GTs
+            # NOTE: read the labels with their on-disk dtype instead of converting them to float64 with get_fdata()
+            pred_labels = np.asanyarray(nib.load(pred_file).dataobj)
+            gt_labels = np.asanyarray(nib.load(gt_file).dataobj)
 
+            for seg in ['sc', 'lesion']:
                 if seg == 'sc':
-                    pred_npy = np.array(pred_npy == 1, dtype=float)
-                    gt_npy = np.array(gt_npy == 1, dtype=float)                
+                    pred_npy = np.array(pred_labels == 1, dtype=float)
+                    gt_npy = np.array(gt_labels == 1, dtype=float)
                 
                 elif seg == 'lesion':
-                    pred_npy = np.array(pred_npy == 2, dtype=float)
-                    gt_npy = np.array(gt_npy == 2, dtype=float)
+                    pred_npy = np.array(pred_labels == 2, dtype=float)
+                    gt_npy = np.array(gt_labels == 2, dtype=float)
                 
                 # Save the binarized predictions and GTs
                 pred_nib = nib.Nifti1Image(pred_npy, affine=np.eye(4))
@@ -217,8 +218,9 @@ def get_test_metrics_by_dataset(pred_folder, gt_folder, output_folder, anima_bin
             assert sub_ses_pred == sub_ses_gt, 'Subject and session IDs for Preds and GTs do not match. Please check the filenames.'
 
             # load the predictions and GTs
-            pred_npy = nib.load(pred_file).get_fdata()
-            gt_npy = nib.load(gt_file).get_fdata()
+            # NOTE: read the labels with their on-disk dtype instead of converting them to float64 with get_fdata()
+            pred_npy = np.asanyarray(nib.load(pred_file).dataobj)
+            gt_npy = np.asanyarray(nib.load(gt_file).dataobj)
             
             # make sure the predictions are binary because ANIMA accepts binarized inputs only
             pred_npy = np.array(pred_npy > 0.5, dtype=float)